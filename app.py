@@ -6,8 +6,32 @@ import numpy as np
 from datetime import datetime, date
 from decimal import Decimal
 import json
-from typing import Dict, Any
+from itertools import islice
+from typing import Dict, Any, Iterator, Optional
 import re
+from openpyxl import load_workbook
+
+# Rows read up front for the preview and type inference, rows per streamed upload chunk,
+# and rows per multi-row INSERT
+SAMPLE_ROWS = 10000
+CHUNK_ROWS = 50000
+BATCH_ROWS = 10000
+
+_COL_SANITIZE = re.compile(r'[^\w]')
+
+# Server-side limit on placeholders in a single prepared statement
+MAX_PREPARED_PARAMS = 65535
+
+_INTEGER_RANGES = {
+    'TINYINT': (-128, 127),
+    'SMALLINT': (-32768, 32767),
+    'INT': (-2147483648, 2147483647),
+    'BIGINT': (-9223372036854775808, 9223372036854775807),
+    'TINYINT UNSIGNED': (0, 255),
+    'SMALLINT UNSIGNED': (0, 65535),
+    'INT UNSIGNED': (0, 4294967295),
+    'BIGINT UNSIGNED': (0, 18446744073709551615)
+}
 
 # Define the DataTypeHandler and MySQLDataUploader classes (your existing code)
 class DataTypeHandler:
@@ -34,30 +58,124 @@ class DataTypeHandler:
             'date': 'DATE'
         }
     
-    def infer_mysql_type(self, series: pd.Series) -> str:
+    def infer_mysql_type(self, series: pd.Series, tighten: bool = False) -> str:
         """
         Infers the MySQL data type for a given Pandas Series.
+        With tighten=True, integer columns get the smallest integer type that fits their values.
         """
-        dtype_str = str(series.dtype)
-        if dtype_str in ['datetime64[ns]', 'datetime64[ns, UTC]']:
-            return 'DATETIME'
-        elif dtype_str == 'timedelta64[ns]':
-            return 'TIME'
-        elif dtype_str == 'date':
-            return 'DATE'
-        if dtype_str in self.type_mapping:
-            return self.type_mapping[dtype_str]
+        dtype_str = self._normalize_dtype(series.dtype)
+        kind = series.dtype.kind
+        if tighten and kind in 'iu':
+            return self._infer_numeric_type(series)
+        if dtype_str == 'object':
+            non_null = series.notna().to_numpy()
+            if non_null.any() and isinstance(series.iloc[non_null.argmax()], Decimal):
+                dtype_str = 'decimal'
+        if dtype_str == 'decimal':
+            return self._infer_decimal_type(series)
+        mysql_type = self.type_mapping.get(dtype_str)
+        if mysql_type is not None:
+            return mysql_type
         if dtype_str in ['object', 'string']:
             return self._infer_string_type(series)
-        if pd.api.types.is_numeric_dtype(series):
+        if kind in 'iuf':
             return self._infer_numeric_type(series)
         return 'TEXT'
     
+    def infer_mysql_types(self, df: pd.DataFrame, tighten: bool = False) -> Dict[str, str]:
+        """
+        Infers the MySQL data type of every column of the DataFrame.
+        """
+        return {col: self.infer_mysql_type(series, tighten) for col, series in df.items()}
+    
+    def fits_mysql_type(self, series: pd.Series, mysql_type: str) -> bool:
+        """
+        Checks whether every value in the Series can be stored in a column of the given MySQL type.
+        """
+        if not series.notna().any():
+            return True
+        kind = self._value_kind(series)
+        base_type = mysql_type.split('(')[0]
+        if mysql_type in _INTEGER_RANGES:
+            bounds = self._integral_bounds(series)
+            if bounds is None:
+                return False
+            low, high = _INTEGER_RANGES[mysql_type]
+            return low <= bounds[0] and bounds[1] <= high
+        if base_type in ('DOUBLE', 'FLOAT'):
+            return kind in 'iuf'
+        if base_type == 'BOOLEAN':
+            return kind == 'b'
+        if base_type == 'DECIMAL':
+            series_type = self.infer_mysql_type(series)
+            if not series_type.startswith('DECIMAL('):
+                return False
+            precision, scale = map(int, mysql_type[8:-1].split(','))
+            series_precision, series_scale = map(int, series_type[8:-1].split(','))
+            return series_scale <= scale and series_precision - series_scale <= precision - scale
+        if base_type == 'VARCHAR':
+            values = series.to_numpy(dtype=object)[series.notna().to_numpy()]
+            return max(map(len, map(str, values))) <= int(mysql_type[8:-1])
+        if base_type in ('TEXT', 'MEDIUMTEXT', 'LONGTEXT'):
+            return True
+        return self.infer_mysql_type(series) == mysql_type
+    
+    def widen_mysql_type(self, mysql_type: str, series: pd.Series) -> str:
+        """
+        Returns mysql_type if every value in the Series fits it, otherwise the narrowest type that
+        holds both the values already covered by mysql_type and the new ones.
+        """
+        if self.fits_mysql_type(series, mysql_type):
+            return mysql_type
+        kind = self._value_kind(series)
+        if mysql_type in _INTEGER_RANGES or mysql_type == 'BOOLEAN':
+            bounds = self._integral_bounds(series)
+            if bounds is not None:
+                low, high = _INTEGER_RANGES.get(mysql_type, (0, 1))
+                low, high = min(low, bounds[0]), max(high, bounds[1])
+                for integer_type, (type_low, type_high) in sorted(
+                        _INTEGER_RANGES.items(), key=lambda item: item[1][1] - item[1][0]):
+                    if type_low <= low and high <= type_high:
+                        return integer_type
+            if kind in 'iufb':
+                return 'DOUBLE'
+        if mysql_type.startswith('DECIMAL('):
+            series_type = self.infer_mysql_type(series)
+            if series_type.startswith('DECIMAL('):
+                precision, scale = map(int, mysql_type[8:-1].split(','))
+                series_precision, series_scale = map(int, series_type[8:-1].split(','))
+                scale = max(scale, series_scale)
+                precision = max(precision - scale, series_precision - series_scale) + scale
+                if precision <= 65 and scale <= 30:
+                    return f'DECIMAL({precision},{scale})'
+        text_type = self._infer_string_type(series)
+        if text_type.startswith('VARCHAR('):
+            if mysql_type.startswith('VARCHAR('):
+                return f'VARCHAR({max(int(mysql_type[8:-1]), int(text_type[8:-1]))})'
+            return 'TEXT'
+        return text_type
+    
+    def _normalize_dtype(self, dtype) -> str:
+        """
+        Maps Arrow-backed dtypes and non-nanosecond datetime units onto the keys of type_mapping.
+        """
+        if isinstance(dtype, pd.ArrowDtype):
+            if str(dtype).startswith('decimal'):
+                return 'decimal'
+            dtype = dtype.numpy_dtype
+            if dtype.kind in 'OSU':
+                return 'string'
+        if dtype.kind == 'M':
+            return 'datetime64[ns]'
+        if dtype.kind == 'm':
+            return 'timedelta64[ns]'
+        return str(dtype)
+    
     def _infer_string_type(self, series: pd.Series) -> str:
-        non_null_values = series.dropna()
-        if len(non_null_values) == 0:
+        values = series.to_numpy(dtype=object)[series.notna().to_numpy()]
+        if len(values) == 0:
             return 'TEXT'
-        max_length = non_null_values.astype(str).str.len().max()
+        max_length = max(map(len, map(str, values)))
         if max_length <= 255:
             return f'VARCHAR({max_length})'
         elif max_length <= 65535:
@@ -67,13 +185,62 @@ class DataTypeHandler:
         else:
             return 'LONGTEXT'
     
+    def _infer_decimal_type(self, series: pd.Series) -> str:
+        """
+        Sizes DECIMAL(precision, scale) to the values present instead of the MySQL maximum.
+        Object columns that cannot be sized keep their TEXT type; Arrow decimals fall back to DECIMAL(65,30).
+        """
+        fallback = self.type_mapping['decimal' if isinstance(series.dtype, pd.ArrowDtype) else 'object']
+        values = series.dropna().tolist()
+        if not values or not all(isinstance(v, Decimal) and v.is_finite() for v in values):
+            return fallback
+        parts = [v.as_tuple() for v in values]
+        exponents = np.fromiter((p.exponent for p in parts), dtype=np.int64, count=len(parts))
+        digits = np.fromiter((len(p.digits) for p in parts), dtype=np.int64, count=len(parts))
+        scale = int(np.maximum(-exponents, 0).max())
+        integer_digits = max(int((digits + exponents).max()), 0)
+        precision = max(integer_digits + scale, 1)
+        if precision > 65 or scale > 30:
+            return fallback
+        return f'DECIMAL({precision},{scale})'
+    
+    def _value_kind(self, series: pd.Series) -> str:
+        """
+        Returns the dtype kind, or for object columns ('O') the kind shared by all non-null values.
+        Excel chunks with empty cells arrive as object columns of bools or numbers.
+        """
+        kind = series.dtype.kind
+        if kind != 'O':
+            return kind
+        values = series.to_numpy(dtype=object)[series.notna().to_numpy()]
+        if all(isinstance(v, (bool, np.bool_)) for v in values):
+            return 'b'
+        if all(isinstance(v, (int, np.integer)) for v in values):
+            return 'i'
+        if all(isinstance(v, (int, float, np.integer, np.floating)) for v in values):
+            return 'f'
+        return kind
+    
+    def _integral_bounds(self, series: pd.Series) -> Optional[tuple]:
+        """
+        Returns the (min, max) of a non-empty numeric Series whose values are all whole numbers, else None.
+        """
+        kind = self._value_kind(series)
+        values = series.dropna().to_numpy()
+        if kind not in 'iu':
+            if kind not in 'fb':
+                return None
+            floats = values.astype(np.float64)
+            if not (np.isfinite(floats).all() and np.array_equal(floats, np.floor(floats))):
+                return None
+        return np.min(values), np.max(values)
+    
     def _infer_numeric_type(self, series: pd.Series) -> str:
         if series.isnull().all():
             return 'DOUBLE'
-        non_null_values = series.dropna()
-        if pd.api.types.is_integer_dtype(series) or all(float(x).is_integer() for x in non_null_values):
-            min_val = non_null_values.min()
-            max_val = non_null_values.max()
+        bounds = self._integral_bounds(series)
+        if bounds is not None:
+            min_val, max_val = bounds
             if min_val >= 0:
                 if max_val <= 255:
                     return 'TINYINT UNSIGNED'
@@ -99,33 +266,72 @@ class MySQLDataUploader:
         self.config = connection_config
         self.connection = None
         self.cursor = None
+        self.insert_cursor = None
+        self.max_allowed_packet = None
         self.type_handler = DataTypeHandler()
+        # INSERT prefix and row placeholder per (table, columns), built once per upload target
+        self._insert_cache: Dict[tuple, tuple] = {}
+        # Exact-type lookup used by _prepare_value in place of an isinstance chain
+        self._dispatch = {
+            type(pd.NaT): lambda v: None,
+            pd.Timestamp: lambda v: v.strftime('%Y-%m-%d %H:%M:%S'),
+            datetime: lambda v: v.strftime('%Y-%m-%d %H:%M:%S'),
+            date: lambda v: v.strftime('%Y-%m-%d'),
+            # Bound as Decimal so values keep the precision their DECIMAL(p,s) column was sized for
+            Decimal: lambda v: None if v.is_nan() else v,
+            np.integer: int,
+            np.floating: lambda v: None if np.isnan(v) else float(v),
+            dict: json.dumps,
+            list: json.dumps
+        }
     
     def connect(self) -> bool:
         try:
             self.connection = mysql.connector.connect(**self.config)
             self.cursor = self.connection.cursor(dictionary=True)
+            # Kept open so the server-side INSERT statement is prepared once and reused across batches
+            self.insert_cursor = self.connection.cursor(prepared=True)
+            # Uploads are committed explicitly, either per insert_data call or once by the caller
+            self.connection.autocommit = False
+            # Each batch is sent as one packet, so batches are sized to stay under the server's limit
+            self.cursor.execute("SELECT @@max_allowed_packet AS max_allowed_packet")
+            self.max_allowed_packet = int(self.cursor.fetchone()['max_allowed_packet'])
             return True
         except Error as e:
             st.error(f"⚠️ Connection Error: {str(e)}")
             return False
     
+    def ensure_connected(self) -> bool:
+        """
+        Reconnects if the server dropped the connection, e.g. after a failed upload.
+        """
+        if self.connection is not None and self.connection.is_connected():
+            return True
+        return self.connect()
+    
     def close(self):
+        connected = self.connection is not None and self.connection.is_connected()
+        if self.insert_cursor:
+            self.insert_cursor.close()
         if self.cursor:
             self.cursor.close()
-        if self.connection and self.connection.is_connected():
+        if connected:
             self.connection.close()
     
-    def create_table(self, table_name: str, df: pd.DataFrame) -> bool:
+    def create_table(self, table_name: str, df: pd.DataFrame,
+                     inferred_types: Optional[Dict[str, str]] = None) -> bool:
         try:
-            clean_columns = [re.sub(r'[^\w]', '_', col.lower()) for col in df.columns]
-            df.columns = clean_columns
+            # Reuse types already inferred for the preview instead of rescanning the columns
+            if inferred_types is None:
+                inferred_types = self.type_handler.infer_mysql_types(df)
+            original_columns = df.columns.tolist()
+            df.columns = df.columns.str.lower().str.replace(_COL_SANITIZE, '_', regex=True)
             column_defs = []
-            for col in df.columns:
-                mysql_type = self.type_handler.infer_mysql_type(df[col])
-                column_defs.append(f"{col} {mysql_type}")
+            for original_col, col in zip(original_columns, df.columns):
+                mysql_type = inferred_types.get(original_col) or self.type_handler.infer_mysql_type(df[col])
+                column_defs.append(f"{self._quote_identifier(col)} {mysql_type}")
             create_query = f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
+                CREATE TABLE IF NOT EXISTS {self._quote_table_name(table_name)} (
                     {', '.join(column_defs)}
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """
@@ -136,48 +342,203 @@ class MySQLDataUploader:
             st.error(f"⚠️ Table Creation Error: {str(e)}")
             return False
     
-    def insert_data(self, table_name: str, df: pd.DataFrame) -> bool:
+    def insert_data(self, table_name: str, df: pd.DataFrame, batch_size: int = BATCH_ROWS,
+                    show_progress: bool = True, commit: bool = True) -> bool:
+        """
+        Inserts the DataFrame in multi-row batches. With commit=False the rows are left in the
+        open transaction so a caller inserting several chunks can commit or roll back once.
+        """
         try:
             columns = df.columns.tolist()
-            placeholders = ', '.join(['%s'] * len(columns))
-            insert_query = f"INSERT INTO {table_name} ({', '.join([f'{col}' for col in columns])}) VALUES ({placeholders})"
-            batch_size = 1000
+            insert_query, placeholders = self._insert_template(table_name, columns)
             total_rows = len(df)
-            progress_bar = st.progress(0)
-            for i in range(0, total_rows, batch_size):
-                batch = df.iloc[i:i + batch_size]
-                values = [tuple(self._prepare_value(val) for val in row) for _, row in batch.iterrows()]
-                self.cursor.executemany(insert_query, values)
+            batch_size = self.effective_batch_size(len(columns), batch_size)
+            rows = self._prepare_dataframe(df)
+            # Running byte totals, so a batch of wide rows can be cut short of max_allowed_packet
+            offsets = np.concatenate(([0], np.cumsum(self._row_bytes(df, rows))))
+            packet_budget = int(self.max_allowed_packet * 0.9)
+            progress_bar = st.progress(0) if show_progress else None
+            # Bulk-load session settings, only for the duration of the insert loop
+            self.cursor.execute("SET unique_checks = 0, foreign_key_checks = 0")
+            try:
+                start = 0
+                while start < total_rows:
+                    end = min(start + batch_size, total_rows)
+                    if offsets[end] - offsets[start] > packet_budget:
+                        fitting_end = int(np.searchsorted(offsets, offsets[start] + packet_budget, side='right')) - 1
+                        end = max(start + 1, fitting_end)
+                    batch = rows[start:end]
+                    # One multi-row INSERT per batch instead of a statement per row
+                    batch_query = insert_query + ', '.join([placeholders] * len(batch))
+                    self.insert_cursor.execute(batch_query, batch.ravel().tolist())
+                    if progress_bar:
+                        progress_bar.progress(end / total_rows)
+                    start = end
+            except Exception:
+                # The connection may already be gone; don't let the restore hide the insert error
+                self._execute_quietly("SET unique_checks = 1, foreign_key_checks = 1")
+                raise
+            self.cursor.execute("SET unique_checks = 1, foreign_key_checks = 1")
+            if commit:
                 self.connection.commit()
-                progress = min(1.0, (i + batch_size) / total_rows)
-                progress_bar.progress(progress)
-            progress_bar.progress(1.0)
+            if progress_bar:
+                progress_bar.progress(1.0)
             return True
         except Error as e:
+            self.rollback()
             st.error(f"⚠️ Data Insertion Error: {str(e)}")
             return False
     
+    def rollback(self):
+        """
+        Rolls back the open transaction, ignoring the error raised when the connection has already dropped.
+        """
+        try:
+            self.connection.rollback()
+        except Error:
+            pass
+    
+    def _execute_quietly(self, query: str):
+        try:
+            self.cursor.execute(query)
+        except Error:
+            pass
+    
+    @staticmethod
+    def _row_bytes(df: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        """
+        Estimates the bytes each prepared row adds to an INSERT packet. Numeric and datetime
+        columns count as fixed-width values; other cells are measured, 4 bytes per non-ASCII character.
+        """
+        sizes = np.zeros(len(rows), dtype=np.int64)
+        for idx, (_, series) in enumerate(df.items()):
+            if series.dtype.kind in 'iufbmM':
+                sizes += 24
+            else:
+                sizes += np.fromiter(
+                    ((len(v) if v.isascii() else 4 * len(v)) + 8 if isinstance(v, str) else 24
+                     for v in rows[:, idx]),
+                    dtype=np.int64, count=len(rows)
+                )
+        return sizes
+    
+    @staticmethod
+    def effective_batch_size(column_count: int, batch_size: int = BATCH_ROWS) -> int:
+        """
+        Caps the batch size so one batch stays within the prepared statement placeholder limit.
+        """
+        return max(1, min(batch_size, MAX_PREPARED_PARAMS // max(1, column_count)))
+    
+    @staticmethod
+    def _quote_identifier(name: str) -> str:
+        return '`' + str(name).replace('`', '``') + '`'
+    
+    @classmethod
+    def _quote_table_name(cls, table_name: str) -> str:
+        # Quote each part so that `database`.`table` names keep working
+        return '.'.join(cls._quote_identifier(part) for part in table_name.split('.'))
+    
+    def _insert_template(self, table_name: str, columns: list) -> tuple:
+        """
+        Returns the cached INSERT prefix and single-row placeholder for a table and column list.
+        """
+        key = (table_name, tuple(columns))
+        template = self._insert_cache.get(key)
+        if template is None:
+            quoted_columns = ', '.join(self._quote_identifier(col) for col in columns)
+            template = (
+                f"INSERT INTO {self._quote_table_name(table_name)} ({quoted_columns}) VALUES ",
+                '(' + ', '.join(['%s'] * len(columns)) + ')'
+            )
+            self._insert_cache[key] = template
+        return template
+    
+    def _prepare_dataframe(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Converts the DataFrame into a row-major object array of insert-ready values,
+        preparing each column as a whole instead of running _prepare_value on every cell.
+        """
+        prepared = []
+        for _, series in df.items():
+            if pd.api.types.is_datetime64_any_dtype(series):
+                series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+            elif series.dtype == object:
+                non_null = series.notna().to_numpy()
+                # Plain string columns are inserted as-is; anything else goes through _prepare_value
+                if non_null.any() and not isinstance(series.iloc[non_null.argmax()], str):
+                    series = series.map(self._prepare_value, na_action='ignore')
+            prepared.append(series.astype(object))
+        frame = pd.concat(prepared, axis=1) if prepared else pd.DataFrame(index=df.index)
+        return np.ascontiguousarray(frame.to_numpy(dtype=object, na_value=None))
+    
     def _prepare_value(self, value: Any) -> Any:
         """
         Prepares the value for MySQL insertion, handling None, datetime, date, Decimal, etc.
         """
-        if pd.isna(value):
-            return None
-        elif isinstance(value, (datetime, pd.Timestamp)):
-            return value.strftime('%Y-%m-%d %H:%M:%S')
-        elif isinstance(value, date):
-            return value.strftime('%Y-%m-%d')
-        elif isinstance(value, Decimal):
-            return float(value)
-        elif isinstance(value, np.integer):
-            return int(value)
-        elif isinstance(value, np.floating):
-            return float(value)
-        elif isinstance(value, (dict, list)):
-            return json.dumps(value)
-        return value
+        value_type = type(value)
+        handler = self._dispatch.get(value_type)
+        if handler is None:
+            # Resolve subclasses (e.g. np.int32 -> np.integer) once and remember the result
+            handler = next(
+                (self._dispatch[base] for base in value_type.__mro__ if base in self._dispatch),
+                self._prepare_scalar
+            )
+            self._dispatch[value_type] = handler
+        return handler(value)
+    
+    @staticmethod
+    def _prepare_scalar(value: Any) -> Any:
+        return None if pd.isna(value) else value
+
 
 
+def _dedupe_columns(names: list) -> list:
+    """
+    Renames repeated column names to name.1, name.2, ... the same way pandas' readers do.
+    """
+    counts: Dict[str, int] = {}
+    deduped = []
+    for name in names:
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f'{name}.{count}'
+            count = counts.get(name, 0)
+        deduped.append(name)
+        counts[name] = count + 1
+    return deduped
+
+
+def iter_file_chunks(uploaded_file, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Streams an uploaded CSV or Excel file as DataFrames of at most chunksize rows.
+    """
+    uploaded_file.seek(0)
+    if uploaded_file.name.endswith('.csv'):
+        with pd.read_csv(uploaded_file, chunksize=chunksize, dtype_backend='pyarrow') as reader:
+            yield from reader
+    elif uploaded_file.name.endswith('.xlsx'):
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            # Like read_excel: read the first sheet and skip rows with no values at all
+            rows = (
+                row for row in workbook.worksheets[0].iter_rows(values_only=True)
+                if any(cell is not None for cell in row)
+            )
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = _dedupe_columns(
+                [f'Unnamed: {i}' if name is None else str(name) for i, name in enumerate(header)]
+            )
+            while True:
+                batch = list(islice(rows, chunksize))
+                if not batch:
+                    break
+                yield pd.DataFrame(batch, columns=columns)
+        finally:
+            workbook.close()
+
 
 def main():
     # Set page title and title icon
@@ -231,11 +592,10 @@ def main():
 
         if uploaded_file:
             try:
-                # Load data based on file type
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                elif uploaded_file.name.endswith('.xlsx'):
-                    df = pd.read_excel(uploaded_file, engine='openpyxl')
+                # Load a sample for the preview and type inference; the full file is streamed on upload
+                chunks = iter_file_chunks(uploaded_file, SAMPLE_ROWS)
+                df = next(chunks, pd.DataFrame())
+                chunks.close()
 
                 # Display data preview
                 st.write("### Data Preview:")
@@ -243,8 +603,14 @@ def main():
 
                 # Display inferred MySQL data types
                 st.markdown("### 🧪 Inferred MySQL Data Types")
-                type_handler = DataTypeHandler()
-                inferred_types = {col: type_handler.infer_mysql_type(df[col]) for col in df.columns}
+                tighten = st.checkbox("🗜️ Use the smallest integer types that fit the data")
+                # Infer once per uploaded file and option; Streamlit reruns main() on every widget interaction
+                inferred_key = (uploaded_file.file_id, tighten)
+                if st.session_state.get('inferred_key') != inferred_key:
+                    type_handler = DataTypeHandler()
+                    st.session_state['inferred_types'] = type_handler.infer_mysql_types(df, tighten)
+                    st.session_state['inferred_key'] = inferred_key
+                inferred_types = st.session_state['inferred_types']
                 for col, dtype in inferred_types.items():
                     st.markdown(f"- **{col}**: `{dtype}`")
 
@@ -253,11 +619,46 @@ def main():
                 if st.button("📤 Upload to MySQL"):
                     if not table_name:
                         st.error("⚠️ Please enter a valid table name.")
-                    else:
+                    elif st.session_state['uploader'].ensure_connected():
                         uploader = st.session_state['uploader']
-                        if uploader.create_table(table_name, df):
-                            if uploader.insert_data(table_name, df):
-                                st.success(f"🎉 Successfully uploaded {len(df)} rows to `{table_name}`!")
+                        # Whole batches per chunk, so only the upload's last batch needs a new prepared statement
+                        batch_rows = uploader.effective_batch_size(len(df.columns))
+                        chunk_rows = max(1, CHUNK_ROWS // batch_rows) * batch_rows
+                        column_types = dict(inferred_types)
+                        if len(df) >= SAMPLE_ROWS:
+                            # The sample may not show every value; widen types to fit the whole file before the DDL
+                            with st.spinner("🔎 Checking column types across the whole file..."):
+                                for chunk in iter_file_chunks(uploaded_file, chunk_rows):
+                                    for col, series in chunk.items():
+                                        column_types[col] = uploader.type_handler.widen_mysql_type(
+                                            column_types[col], series
+                                        )
+                            widened = [
+                                f"{col}: `{column_types[col]}`" for col in column_types
+                                if column_types[col] != inferred_types[col]
+                            ]
+                            if widened:
+                                st.info(f"ℹ️ Widened to fit rows beyond the preview: {', '.join(widened)}")
+                        if uploader.create_table(table_name, df, column_types):
+                            total_rows = 0
+                            status = st.empty()
+                            # All chunks go into one transaction; insert_data rolls it back on failure
+                            try:
+                                for chunk in iter_file_chunks(uploaded_file, chunk_rows):
+                                    # create_table sanitized the sample's column names; match them
+                                    chunk.columns = df.columns
+                                    if not uploader.insert_data(table_name, chunk, show_progress=False,
+                                                                commit=False):
+                                        break
+                                    total_rows += len(chunk)
+                                    status.text(f"⏳ Inserted {total_rows} rows...")
+                                else:
+                                    uploader.connection.commit()
+                                    status.empty()
+                                    st.success(f"🎉 Successfully uploaded {total_rows} rows to `{table_name}`!")
+                            except Exception:
+                                uploader.rollback()
+                                raise
             except Exception as e:
                 st.error(f"⚠️ Error processing file: {str(e)}")
 